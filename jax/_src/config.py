@@ -382,7 +382,7 @@ class Config:
     return (axis_env_state, self.x64_enabled, self.jax_numpy_rank_promotion,
             self.jax_default_matmul_precision, self.jax_dynamic_shapes,
             self.jax_numpy_dtype_promotion, self.jax_default_device,
-            self.jax_array)
+            self.jax_array, self.jax_reduce_window_bf16_accum)
 
 class NoDefault: pass
 no_default = NoDefault()
@@ -471,6 +471,7 @@ class _GlobalExtraJitContext(NamedTuple):
   numpy_dtype_promotion: Optional[str] = None
   default_matmul_precision: Optional[Any] = None
   dynamic_shapes: bool = False
+  reduce_window_bf16_accum: bool = False
 
 
 def _update_global_jit_state(**kw):
@@ -494,6 +495,7 @@ class _ThreadLocalExtraJitContext(NamedTuple):
   numpy_dtype_promotion: Optional[str] = None
   default_matmul_precision: Optional[Any] = None
   dynamic_shapes: bool = False
+  reduce_window_bf16_accum: bool = False
 
 
 class _ThreadLocalStateCache(threading.local):
@@ -867,6 +869,18 @@ bcoo_cusparse_lowering = config.define_bool_state(
     default=True,
     help=('Enables lowering BCOO ops to cuSparse.'))
 
+reduce_window_bf16_accum = config.define_bool_state(
+    name='jax_reduce_window_bf16_accum',
+    default=False,
+    help=('On CPU, compute float32 window sums (e.g. average pooling) in '
+          'bfloat16 and convert the result back to float32. This halves the '
+          'memory traffic of large windows at a substantial loss of '
+          'precision.'),
+    update_global_hook=lambda val: \
+      _update_global_jit_state(reduce_window_bf16_accum=val),
+    update_thread_local_hook=lambda val: \
+      update_thread_local_jit_state(reduce_window_bf16_accum=val))
+
 # TODO(mattjj): remove this flag when we ensure we only succeed at trace-staging
 # if the intended backend can handle lowering the result
 config.define_bool_state(
@@ -12,8 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 from functools import partial
-from typing import (Any, Callable, Optional, Sequence, Union, Tuple)
+import itertools
+from typing import (Any, Callable, List, Optional, Sequence, Union, Tuple)
 import warnings
 
 import numpy as np
@@ -29,6 +31,7 @@ from jax.core import (ShapedArray, ConcreteArray)
 from jax import tree_util
 
 from jax._src import ad_util
+from jax._src.config import config
 from jax._src import dtypes
 import jax._src.lax.lax as lax
 import jax._src.lax.convolution as convolution
@@ -37,12 +40,27 @@ from jax._src.lib.mlir import ir
 from jax._src.lib.mlir.dialects import mhlo
 import jax._src.util as util
 
-map = util.safe_map
-zip = util.safe_zip
+map, unsafe_map = util.safe_map, map
+zip, unsafe_zip = util.safe_zip, zip
 
 Array = Any
 
 
+@functools.lru_cache(maxsize=16)
+def _ones_tuple(n: int) -> Tuple[int, ...]:
+  return (1,) * n
+
+
+@functools.lru_cache(maxsize=1024)
+def _compute_padding(operand_shape, window_dimensions, window_strides,
+                     window_dilation, padding: str) -> Tuple[Tuple[int, int], ...]:
+  dilated_window_dims = (
+      window_dimensions if window_dilation is None else
+      lax._dilate_shape(window_dimensions, window_dilation))
+  return tuple(lax.padtype_to_pads(
+      operand_shape, dilated_window_dims, window_strides, padding))
+
+
 def reduce_window(operand, init_value, computation: Callable,
                   window_dimensions: core.Shape, window_strides: Sequence[int],
                   padding: Union[str, Sequence[Tuple[int, int]]],
@@ -63,17 +81,16 @@ def reduce_window(operand, init_value, computation: Callable,
     raise ValueError('Must have same total number of operands as init_values: '
                      f' {len(flat_operands)} vs. {len(flat_init_values)}')
   if isinstance(padding, str):
-    dilated_window_dims = (
-        window_dimensions if window_dilation is None else
-        lax._dilate_shape(window_dimensions, window_dilation))
-    padding = tuple(lax.padtype_to_pads(
-        flat_operands[0].shape, dilated_window_dims, window_strides, padding))
+    padding = _compute_padding(
+        tuple(flat_operands[0].shape), tuple(window_dimensions),
+        tuple(window_strides),
+        None if window_dilation is None else tuple(window_dilation), padding)
   else:
     padding = tuple(padding)
   if base_dilation is None:
-    base_dilation = (1,) * len(window_dimensions)
+    base_dilation = _ones_tuple(len(window_dimensions))
   if window_dilation is None:
-    window_dilation = (1,) * len(window_dimensions)
+    window_dilation = _ones_tuple(len(window_dimensions))
   monoid_reducer = _get_monoid_window_reducer(computation, flat_init_values)
   if monoid_reducer:
     return monoid_reducer(operand, window_dimensions, window_strides, padding,
@@ -98,28 +115,45 @@ def _get_monoid_window_reducer(monoid_op: Callable,
                                xs: Sequence[Array]) -> Optional[Callable]:
   if len(xs) != 1:
     return None
+  entry = _monoid_window_reducers.get(monoid_op)
+  if entry is None:
+    return None
+  identity, reducer = entry
   x, = xs
   aval = core.get_aval(x)
   if (type(aval) is ConcreteArray) and aval.shape == ():
-    if monoid_op is lax.add:
-      return aval.val == 0 and _reduce_window_sum
-    elif monoid_op is lax.max:
-      return (aval.val == lax._get_max_identity(aval.dtype)
-              and _reduce_window_max)
-    elif monoid_op is lax.min:
-      return (aval.val == lax._get_min_identity(aval.dtype)
-              and _reduce_window_min)
+    return aval.val == identity(aval.dtype) and reducer
   return None
 
+def _is_identity_window(operand, window_dimensions, window_strides, padding,
+                        base_dilation, window_dilation) -> bool:
+  """Whether a monoid window reduction returns `operand` unchanged."""
+  return (lax._is_array_or_tracer(operand) and
+          np.ndim(operand) == len(window_dimensions) and
+          len(window_strides) == len(padding) == len(window_dimensions) and
+          all(d == 1 for d in window_dimensions) and
+          all(s == 1 for s in window_strides) and
+          all(lo == 0 and hi == 0 for lo, hi in padding) and
+          (base_dilation is None or
+           (len(base_dilation) == len(window_dimensions) and
+            all(d == 1 for d in base_dilation))) and
+          (window_dilation is None or
+           (len(window_dilation) == len(window_dimensions) and
+            all(d == 1 for d in window_dilation))))
+
 def _reduce_window_sum(operand: Array, window_dimensions: core.Shape,
                        window_strides: Sequence[int],
                        padding: Sequence[Tuple[int, int]],
                        base_dilation: Optional[Sequence[int]] = None,
                        window_dilation: Optional[Sequence[int]] = None) -> Array:
+  if (_is_identity_window(operand, window_dimensions, window_strides, padding,
+                          base_dilation, window_dilation) and
+      dtypes.issubdtype(operand.dtype, np.number)):
+    return operand
   if base_dilation is None:
-    base_dilation = (1,) * len(window_dimensions)
+    base_dilation = _ones_tuple(len(window_dimensions))
   if window_dilation is None:
-    window_dilation = (1,) * len(window_dimensions)
+    window_dilation = _ones_tuple(len(window_dimensions))
   return reduce_window_sum_p.bind(
       operand, window_dimensions=tuple(window_dimensions),
       window_strides=tuple(window_strides), padding=tuple(padding),
@@ -134,9 +168,9 @@ def _reduce_window_prod(operand: Array, window_dimensions: core.Shape,
   init_value = lax._const(operand, 1)
   jaxpr, consts = lax._reduction_jaxpr(lax.mul, lax._abstractify(init_value))
   if base_dilation is None:
-    base_dilation = (1,) * len(window_dimensions)
+    base_dilation = _ones_tuple(len(window_dimensions))
   if window_dilation is None:
-    window_dilation = (1,) * len(window_dimensions)
+    window_dilation = _ones_tuple(len(window_dimensions))
   out, = reduce_window_p.bind(
       operand, init_value, jaxpr=jaxpr, consts=consts,
       window_dimensions=tuple(window_dimensions),
@@ -150,10 +184,13 @@ def _reduce_window_max(operand: Array, window_dimensions: core.Shape,
                        padding: Sequence[Tuple[int, int]],
                        base_dilation: Optional[Sequence[int]] = None,
                        window_dilation: Optional[Sequence[int]] = None) -> Array:
+  if _is_identity_window(operand, window_dimensions, window_strides, padding,
+                         base_dilation, window_dilation):
+    return operand
   if base_dilation is None:
-    base_dilation = (1,) * len(window_dimensions)
+    base_dilation = _ones_tuple(len(window_dimensions))
   if window_dilation is None:
-    window_dilation = (1,) * len(window_dimensions)
+    window_dilation = _ones_tuple(len(window_dimensions))
   return reduce_window_max_p.bind(
       operand, window_dimensions=tuple(window_dimensions),
       window_strides=tuple(window_strides), padding=tuple(padding),
@@ -165,16 +202,26 @@ def _reduce_window_min(operand: Array, window_dimensions: core.Shape,
                        padding: Sequence[Tuple[int, int]],
                        base_dilation: Optional[Sequence[int]] = None,
                        window_dilation: Optional[Sequence[int]] = None) -> Array:
+  if _is_identity_window(operand, window_dimensions, window_strides, padding,
+                         base_dilation, window_dilation):
+    return operand
   if base_dilation is None:
-    base_dilation = (1,) * len(window_dimensions)
+    base_dilation = _ones_tuple(len(window_dimensions))
   if window_dilation is None:
-    window_dilation = (1,) * len(window_dimensions)
+    window_dilation = _ones_tuple(len(window_dimensions))
   return reduce_window_min_p.bind(
       operand, window_dimensions=tuple(window_dimensions),
       window_strides=tuple(window_strides), padding=tuple(padding),
       base_dilation=tuple(base_dilation),
       window_dilation=tuple(window_dilation))
 
+# Maps a monoid reduction op to its (identity, reduce_window wrapper) pair.
+_monoid_window_reducers = {
+    lax.add: (lambda _: 0, _reduce_window_sum),
+    lax.max: (lax._get_max_identity, _reduce_window_max),
+    lax.min: (lax._get_min_identity, _reduce_window_min),
+}
+
 def _select_and_scatter(operand: Array, select: Callable,
                         window_dimensions: core.Shape,
                         window_strides: Sequence[int],
@@ -242,7 +289,8 @@ def _reduce_window_abstract_eval_rule(
     *avals, jaxpr, consts, window_dimensions, window_strides, padding,
     base_dilation, window_dilation):
   operand_avals, init_val_avals = util.split_list(avals, [len(avals) // 2])
-  if any(o.dtype != iv.dtype for o, iv in zip(operand_avals, init_val_avals)):
+  if any(o.dtype != iv.dtype
+         for o, iv in unsafe_zip(operand_avals, init_val_avals)):
     msg = ("reduce_window got inconsistent dtypes for operands and init_values:"
            " got operand dtypes {} and init_value dtypes {}.")
     raise TypeError(msg.format([o.dtype for o in operand_avals],
@@ -284,6 +332,11 @@ def _generic_reduce_window_batch_rule(
   return outs, (0,) * num_operands
 
 
+def _padding_attr(padding) -> ir.DenseIntElementsAttr:
+  return ir.DenseIntElementsAttr.get(np.asarray(padding, np.int64),
+                                     shape=(len(padding), 2))
+
+
 reduce_window_p = core.Primitive('reduce_window')
 reduce_window_p.multiple_results = True
 reduce_window_p.def_impl(partial(xla.apply_primitive, reduce_window_p))
@@ -297,24 +350,51 @@ def _generic_reduce_window_lower(ctx, *args, jaxpr, consts,
   _, init_value_avals = util.split_list(ctx.avals_in, [len(operands)])
   scalar_types = [mlir.aval_to_ir_type(aval) for aval in init_value_avals]
   rw = mhlo.ReduceWindowOp(
-      map(mlir.aval_to_ir_type, ctx.avals_out),
+      [mlir.aval_to_ir_type(aval) for aval in ctx.avals_out],
       operands,
       init_values,
       mlir.dense_int_elements(window_dimensions),
       window_strides=mlir.dense_int_elements(window_strides),
       base_dilations=mlir.dense_int_elements(base_dilation),
       window_dilations=mlir.dense_int_elements(window_dilation),
-      padding=ir.DenseIntElementsAttr.get(np.asarray(padding, np.int64),
-                                          shape=(len(padding), 2)))
+      padding=_padding_attr(padding))
   reducer = rw.regions[0].blocks.append(*(scalar_types + scalar_types))
   with ir.InsertionPoint(reducer):
     if jaxpr.effects:
       raise NotImplementedError('Cannot lower effectful `reduce_window`.')
-    out_nodes, _ = mlir.jaxpr_subcomp(ctx.module_context, jaxpr,
-        mlir.TokenSet(), consts, *([a] for a in reducer.arguments))
-    mhlo.ReturnOp(util.flatten(out_nodes))
+    reduce_op = _single_primitive_reducer(jaxpr)
+    if reduce_op is not None:
+      mhlo.ReturnOp(reduce_op(*reducer.arguments))
+    else:
+      out_nodes, _ = mlir.jaxpr_subcomp(ctx.module_context, jaxpr,
+          mlir.TokenSet(), consts, *([a] for a in reducer.arguments))
+      mhlo.ReturnOp(util.flatten(out_nodes))
   return rw.results
 
+# Binary primitives whose lowering is a single MHLO op, for reducer bodies that
+# can be emitted without lowering the reducer jaxpr.
+_inline_reducer_ops = {
+    lax.add_p: mhlo.AddOp,
+    lax.mul_p: mhlo.MulOp,
+    lax.max_p: mlir.max_mhlo,
+    lax.min_p: mlir.min_mhlo,
+    lax.and_p: mhlo.AndOp,
+    lax.or_p: mhlo.OrOp,
+}
+
+def _single_primitive_reducer(jaxpr: core.Jaxpr) -> Optional[Callable]:
+  """Returns the MHLO op for a reducer that applies one binary primitive to its
+  two arguments, e.g. the jaxpr of `lax.add`, or None."""
+  if jaxpr.constvars or len(jaxpr.invars) != 2 or len(jaxpr.eqns) != 1:
+    return None
+  eqn, = jaxpr.eqns
+  if (eqn.primitive not in _inline_reducer_ops or
+      eqn.outvars != jaxpr.outvars or
+      # All the primitives above are commutative.
+      eqn.invars not in (jaxpr.invars, jaxpr.invars[::-1])):
+    return None
+  return _inline_reducer_ops[eqn.primitive]
+
 mlir.register_lowering(reduce_window_p, _generic_reduce_window_lower)
 
 
@@ -336,13 +416,24 @@ def _reduce_window_sum_transpose_rule(cotangent, operand, *, window_dimensions,
       input_shape, window_dimensions, window_strides, cotangent.shape, padding,
       base_dilation, window_dilation)
   ones = [1] * len(input_shape)
-  padding_config = [(lo, hi, stride - 1)
-                    for (lo, hi), stride in zip(pads, window_strides)]
-  pad_cotangent = lax.pad(cotangent, lax._zero(cotangent), padding_config)
-  result = _reduce_window_sum(pad_cotangent, window_dimensions, base_dilation,
-                              [(0, 0)] * len(input_shape),
-                              base_dilation=ones,
-                              window_dilation=window_dilation)
+  if (all(s == 1 for s in window_strides) and
+      all(lo >= 0 and hi >= 0 for lo, hi in pads)):
+    # Without strides there is no interior padding, so the edge padding can be
+    # folded into the reduction's own padding and the padded cotangent is never
+    # materialized. Strided transposes keep the explicit pad: expressing them
+    # with base dilation would rule out the unit-base-dilation CPU lowerings and
+    # jax2tf's enable_xla=False conversion.
+    result = _reduce_window_sum(cotangent, window_dimensions, base_dilation,
+                                pads, base_dilation=ones,
+                                window_dilation=window_dilation)
+  else:
+    padding_config = [(lo, hi, stride - 1)
+                      for (lo, hi), stride in zip(pads, window_strides)]
+    pad_cotangent = lax.pad(cotangent, lax._zero(cotangent), padding_config)
+    result = _reduce_window_sum(pad_cotangent, window_dimensions, base_dilation,
+                                [(0, 0)] * len(input_shape),
+                                base_dilation=ones,
+                                window_dilation=window_dilation)
   assert result.shape == input_shape, (result.shape, input_shape)
   return [result]
 
@@ -353,12 +444,12 @@ def _reduce_window_batch_rule(reduce_window, batched_args, bdims, *,
   bdim, = bdims
 
   if bdim is not None:
-    window_dimensions = \
-        window_dimensions[:bdim] + (1,) + window_dimensions[bdim:]
-    window_strides = window_strides[:bdim] + (1,) + window_strides[bdim:]
-    padding = padding[:bdim] + ((0, 0),) + padding[bdim:]
-    base_dilation = base_dilation[:bdim] + (1,) + base_dilation[bdim:]
-    window_dilation = window_dilation[:bdim] + (1,) + window_dilation[bdim:]
+    insert = util.tuple_insert
+    window_dimensions = insert(window_dimensions, bdim, 1)
+    window_strides = insert(window_strides, bdim, 1)
+    padding = insert(padding, bdim, (0, 0))
+    base_dilation = insert(base_dilation, bdim, 1)
+    window_dilation = insert(window_dilation, bdim, 1)
 
   operand = reduce_window(operand, window_dimensions, window_strides, padding,
                           base_dilation, window_dilation)
@@ -414,6 +505,15 @@ def _common_reduce_window_shape_rule(operand, window_dimensions,
 def reduce_window_shape_tuple(operand_shape, window_dimensions, window_strides,
                               padding, base_dilation=None,
                               window_dilation=None):
+  ndim = len(operand_shape)
+  if (all(type(d) is int for d in operand_shape) and
+      len(window_dimensions) == len(window_strides) == len(padding) == ndim and
+      (base_dilation is None or len(base_dilation) == ndim) and
+      (window_dilation is None or len(window_dilation) == ndim)):
+    return _reduce_window_shape_tuple_constant(
+        operand_shape, window_dimensions, window_strides, padding,
+        _ones_tuple(ndim) if base_dilation is None else base_dilation,
+        _ones_tuple(ndim) if window_dilation is None else window_dilation)
   if base_dilation is not None:
     operand_shape = lax._dilate_shape(operand_shape, base_dilation)
   if window_dilation is not None:
@@ -422,6 +522,24 @@ def reduce_window_shape_tuple(operand_shape, window_dimensions, window_strides,
   operand_padded = core.sum_shapes(operand_shape, pads_lo, pads_hi)
   return core.stride_shape(operand_padded, window_dimensions, window_strides)
 
+def _reduce_window_shape_tuple_constant(operand_shape, window_dimensions,
+                                        window_strides, padding, base_dilation,
+                                        window_dilation):
+  # Computes the same result as the generic path of reduce_window_shape_tuple
+  # for constant shapes, with plain integer arithmetic in a single pass rather
+  # than a dimension-handler dispatch per helper and per dimension.
+  for dilation in (base_dilation, window_dilation):
+    if any(d <= 0 for d in dilation):
+      raise TypeError(f"All dilations must be positive, got {dilation}.")
+  out = []
+  for d, w, s, (lo, hi), bd, wd in zip(operand_shape, window_dimensions,
+                                       window_strides, padding, base_dilation,
+                                       window_dilation):
+    d = (0 if d == 0 else 1 + bd * (d - 1)) + lo + hi
+    w = 0 if w == 0 else 1 + wd * (w - 1)
+    out.append(0 if d == 0 or w > d else int((d - w) // s + 1))
+  return tuple(out)
+
 reduce_window_max_p = lax.standard_primitive(
     _common_reduce_window_shape_rule, lax._input_dtype, 'reduce_window_max')
 ad.defjvp(reduce_window_max_p, partial(_reduce_window_chooser_jvp_rule,
@@ -454,19 +572,252 @@ def _reduce_window_lower(
       window_strides=mlir.dense_int_elements(window_strides),
       base_dilations=mlir.dense_int_elements(base_dilation),
       window_dilations=mlir.dense_int_elements(window_dilation),
-      padding=ir.DenseIntElementsAttr.get(np.asarray(padding, np.int64),
-                                          shape=(len(padding), 2)))
+      padding=_padding_attr(padding))
   reducer = rw.regions[0].blocks.append(scalar_type, scalar_type)
   with ir.InsertionPoint(reducer):
     mhlo.ReturnOp(reduce_op(*reducer.arguments))
   return rw.results
 
+def _full_window_axes(operand_aval, *, window_dimensions, window_strides,
+                      padding, base_dilation, window_dilation) -> List[int]:
+  """Returns the axes that the window covers entirely in a single step."""
+  del window_strides  # Unused: a full-size window yields a single output.
+  return [i for i, (d, w, (lo, hi), bd, wd) in enumerate(zip(
+              operand_aval.shape, window_dimensions, padding, base_dilation,
+              window_dilation))
+          if type(d) is int and w == d > 1 and lo == hi == 0 and bd == wd == 1]
+
+def _reduce_window_full_axes(prim, reduce_axes, full_axes, operand, *,
+                             window_dimensions, window_strides, padding,
+                             base_dilation, window_dilation):
+  # Reduce the fully covered axes with a plain reduction, which backends
+  # implement much more efficiently than a ReduceWindow, and leave only the
+  # sliding axes to the windowed reduction.
+  out = lax.expand_dims(reduce_axes(operand, full_axes), full_axes)
+  pick = lambda xs, default: tuple(default if i in full_axes else x
+                                   for i, x in enumerate(xs))
+  window_dimensions = pick(window_dimensions, 1)
+  window_strides = pick(window_strides, 1)
+  if _is_identity_window(out, window_dimensions, window_strides, padding,
+                         base_dilation, window_dilation):
+    return out
+  return prim.bind(
+      out, window_dimensions=window_dimensions, window_strides=window_strides,
+      padding=padding, base_dilation=base_dilation,
+      window_dilation=window_dilation)
+
+def _reduce_window_full_axes_lower(prim, reduce_axes, lower, ctx, operand,
+                                   **params):
+  operand_aval, = ctx.avals_in
+  full_axes = _full_window_axes(operand_aval, **params)
+  if not full_axes:
+    return lower(ctx, operand, **params)
+  impl = partial(_reduce_window_full_axes, prim, reduce_axes, tuple(full_axes))
+  return mlir.lower_fun(impl, multiple_results=False)(ctx, operand, **params)
+
 mlir.register_lowering(reduce_window_sum_p, partial(
-    _reduce_window_lower, mhlo.AddOp, lambda _: 0))
+    _reduce_window_full_axes_lower, reduce_window_sum_p, lax._reduce_sum,
+    partial(_reduce_window_lower, mhlo.AddOp, lambda _: 0)))
 mlir.register_lowering(reduce_window_min_p, partial(
-    _reduce_window_lower, mlir.min_mhlo, lax._get_min_identity))
+    _reduce_window_full_axes_lower, reduce_window_min_p, lax._reduce_min,
+    partial(_reduce_window_lower, mlir.min_mhlo, lax._get_min_identity)))
 mlir.register_lowering(reduce_window_max_p, partial(
-    _reduce_window_lower, mlir.max_mhlo, lax._get_max_identity))
+    _reduce_window_full_axes_lower, reduce_window_max_p, lax._reduce_max,
+    partial(_reduce_window_lower, mlir.max_mhlo, lax._get_max_identity)))
+
+# Smallest window for which the O(n) prefix-scan lowering below is used in
+# place of the direct O(n * window) ReduceWindow. On CPU the prefix scan is
+# slower than ReduceWindow for windows of up to 48 elements, about even at 64,
+# and faster for every measured window of 96 elements or more.
+_PREFIX_SCAN_MIN_WINDOW = 96
+
+def _prefix_scan_window_axis(operand_aval, out_aval, *, window_dimensions,
+                             window_strides, padding, base_dilation,
+                             window_dilation) -> Optional[int]:
+  """Returns the axis to reduce with a prefix scan, or None if not applicable.
+
+  The prefix-scan algorithm applies when the window slides along a single
+  axis with unit stride and no dilation."""
+  del padding  # Unused.
+  if not (all(map(core.is_constant_dim, operand_aval.shape)) and
+          all(s == 1 for s in window_strides) and
+          all(d == 1 for d in base_dilation) and
+          all(d == 1 for d in window_dilation)):
+    return None
+  axes = [i for i, d in enumerate(window_dimensions) if d != 1]
+  if len(axes) != 1:
+    return None
+  axis, = axes
+  if (window_dimensions[axis] < _PREFIX_SCAN_MIN_WINDOW or
+      out_aval.shape[axis] == 0):
+    return None
+  return axis
+
+def _reduce_window_prefix_scan(reduce_fn, cumulative_reduce, init_value,
+                               idempotent, operand, *, axis,
+                               window_dimensions, padding):
+  """Sliding-window reduction along `axis` using van Herk/Gil-Werman blocking.
+
+  The padded operand is split into blocks of `window` elements. Every window
+  then spans at most two blocks, and its value is the reduction of a suffix of
+  the first block with a prefix of the second; both are computed for all
+  positions at once with a cumulative reduction, giving O(n) work regardless
+  of the window size.
+  """
+  window = window_dimensions[axis]
+  lo, hi = padding[axis]
+  n = operand.shape[axis] + lo + hi
+  num_blocks = -(-n // window)
+  pads = [(l, h, 0) for l, h in padding]
+  pads[axis] = (lo, hi + num_blocks * window - n, 0)
+  x = lax.pad(operand, lax._const(operand, init_value(operand.dtype)), pads)
+  blocks = lax.reshape(
+      x, x.shape[:axis] + (num_blocks, window) + x.shape[axis + 1:])
+  prefix = lax.reshape(cumulative_reduce(blocks, axis=axis + 1), x.shape)
+  suffix = lax.reshape(cumulative_reduce(blocks, axis=axis + 1, reverse=True),
+                       x.shape)
+  out_size = n - window + 1
+  suffix = slicing.slice_in_dim(suffix, 0, out_size, axis=axis)
+  prefix = slicing.slice_in_dim(prefix, window - 1, window - 1 + out_size,
+                                axis=axis)
+  out = reduce_fn(suffix, prefix)
+  if not idempotent:
+    # A window starting on a block boundary is exactly one block, which the
+    # suffix already covers in full; combining it with the prefix of the same
+    # block would count every element twice.
+    aligned = lax.broadcast_in_dim(np.arange(out_size) % window == 0,
+                                   out.shape, (axis,))
+    out = lax.select(aligned, suffix, out)
+  return out
+
+# Smallest number of elements per window for which a window spanning several
+# axes is reduced one axis at a time. Smaller windows are unrolled below; all
+# larger ones are faster as one-axis passes than as a single ReduceWindow on
+# CPU.
+_SEPARABLE_MIN_WINDOW_SIZE = 10
+
+def _separable_window_axes(operand_aval, *, window_dimensions, window_strides,
+                           padding, base_dilation,
+                           window_dilation) -> Optional[List[int]]:
+  """Returns the windowed axes if the window should be reduced axis by axis.
+
+  Sum, min and max over a rectangular window can be computed as a sequence of
+  one-axis reductions, which reads each input element
+  `sum(window_dimensions)` rather than `prod(window_dimensions)` times."""
+  del window_strides, padding, window_dilation  # Unused.
+  if not (all(map(core.is_constant_dim, operand_aval.shape)) and
+          all(d == 1 for d in base_dilation)):
+    return None
+  axes = [i for i, d in enumerate(window_dimensions) if d != 1]
+  if (len(axes) < 2 or
+      np.prod(window_dimensions) < _SEPARABLE_MIN_WINDOW_SIZE):
+    return None
+  return axes
+
+def _reduce_window_separable(prim, axes, operand, *, window_dimensions,
+                             window_strides, padding, base_dilation,
+                             window_dilation):
+  # The first pass also applies the strides and padding of all axes that are
+  # not windowed, so that later passes run on the smallest possible array.
+  passes = [set(range(operand.ndim)) - set(axes[1:])] + [{a} for a in axes[1:]]
+  out = operand
+  for pass_axes in passes:
+    pick = lambda xs, default: tuple(x if i in pass_axes else default
+                                     for i, x in enumerate(xs))
+    out = prim.bind(
+        out, window_dimensions=pick(window_dimensions, 1),
+        window_strides=pick(window_strides, 1), padding=pick(padding, (0, 0)),
+        base_dilation=base_dilation,
+        window_dilation=pick(window_dilation, 1))
+  return out
+
+# Largest number of elements per window for which the window is reduced as an
+# unrolled elementwise combination of strided slices. On CPU this beats
+# ReduceWindow for 2x2 and 3x3 pools; larger multi-axis windows are about as
+# fast or faster as one-axis passes, each of which is unrolled in turn.
+_UNROLL_MAX_WINDOW_SIZE = 9
+
+def _reduce_window_unrolled(reduce_fn, init_value, operand, *,
+                            window_dimensions, window_strides, padding,
+                            base_dilation, window_dilation):
+  """Reduces a small window as an elementwise combination of strided slices.
+
+  Each window position contributes one strided slice of the padded operand,
+  which XLA fuses into a single elementwise loop, e.g. the four slices of a
+  2x2 max-pool become four loads and three maximums per output element."""
+  out_shape = reduce_window_shape_tuple(
+      operand.shape, window_dimensions, window_strides, padding, base_dilation,
+      window_dilation)
+  pads = [(lo, hi, d - 1) for (lo, hi), d in zip(padding, base_dilation)]
+  x = lax.pad(operand, lax._const(operand, init_value(operand.dtype)), pads)
+  out = None
+  for offsets in itertools.product(*(range(w) for w in window_dimensions)):
+    start = [o * d for o, d in zip(offsets, window_dilation)]
+    limit = [i + (n - 1) * s + 1
+             for i, n, s in zip(start, out_shape, window_strides)]
+    window_slice = slicing.slice(x, start, limit, window_strides)
+    out = window_slice if out is None else reduce_fn(out, window_slice)
+  return out
+
+def _reduce_window_sum_bf16(operand, **params):
+  out = reduce_window_sum_p.bind(
+      lax.convert_element_type(operand, dtypes.bfloat16), **params)
+  return lax.convert_element_type(out, operand.dtype)
+
+def _reduce_window_cpu_lower(prim, reduce_op, init_value, reduce_fn,
+                             cumulative_reduction, idempotent, ctx, operand,
+                             **params):
+  operand_aval, = ctx.avals_in
+  aval_out, = ctx.avals_out
+  axis = _prefix_scan_window_axis(operand_aval, aval_out, **params)
+  if (axis is not None and
+      dtypes.issubdtype(operand_aval.dtype, np.number) and
+      not (idempotent and
+           dtypes.issubdtype(operand_aval.dtype, np.complexfloating))):
+    # Imported here to avoid a circular import with the cumulative reductions,
+    # which are themselves defined in terms of reduce_window.
+    from jax._src.lax.control_flow import loops  # pylint: disable=g-import-not-at-top
+    impl = partial(_reduce_window_prefix_scan, reduce_fn,
+                   getattr(loops, cumulative_reduction), init_value, idempotent)
+    return mlir.lower_fun(impl, multiple_results=False)(
+        ctx, operand, axis=axis, window_dimensions=params['window_dimensions'],
+        padding=params['padding'])
+  axes = _separable_window_axes(operand_aval, **params)
+  if axes is not None:
+    return mlir.lower_fun(partial(_reduce_window_separable, prim, axes),
+                          multiple_results=False)(ctx, operand, **params)
+  if (all(map(core.is_constant_dim, operand_aval.shape)) and
+      all(d > 0 for d in aval_out.shape) and
+      1 < np.prod(params['window_dimensions']) <= _UNROLL_MAX_WINDOW_SIZE):
+    impl = partial(_reduce_window_unrolled, reduce_fn, init_value)
+    return mlir.lower_fun(impl, multiple_results=False)(ctx, operand, **params)
+  return _reduce_window_lower(reduce_op, init_value, ctx, operand, **params)
+
+_reduce_window_sum_cpu_lower_f32 = partial(
+    _reduce_window_full_axes_lower, reduce_window_sum_p, lax._reduce_sum,
+    partial(_reduce_window_cpu_lower, reduce_window_sum_p, mhlo.AddOp,
+            lambda _: 0, lax.add, 'cumsum', False))
+
+def _reduce_window_sum_cpu_lower(ctx, operand, **params):
+  operand_aval, = ctx.avals_in
+  if (operand_aval.dtype == np.float32 and
+      config.jax_reduce_window_bf16_accum):
+    # Convert before the fully covered axes are split off, so that those are
+    # summed in bfloat16 too.
+    return mlir.lower_fun(_reduce_window_sum_bf16, multiple_results=False)(
+        ctx, operand, **params)
+  return _reduce_window_sum_cpu_lower_f32(ctx, operand, **params)
+
+mlir.register_lowering(reduce_window_sum_p, _reduce_window_sum_cpu_lower,
+                       platform='cpu')
+mlir.register_lowering(reduce_window_min_p, partial(
+    _reduce_window_full_axes_lower, reduce_window_min_p, lax._reduce_min,
+    partial(_reduce_window_cpu_lower, reduce_window_min_p, mlir.min_mhlo,
+            lax._get_min_identity, lax.min, 'cummin', True)), platform='cpu')
+mlir.register_lowering(reduce_window_max_p, partial(
+    _reduce_window_full_axes_lower, reduce_window_max_p, lax._reduce_max,
+    partial(_reduce_window_cpu_lower, reduce_window_max_p, mlir.max_mhlo,
+            lax._get_max_identity, lax.max, 'cummax', True)), platform='cpu')
 
 
 
@@ -500,8 +851,7 @@ def _select_and_scatter_lower(
       init_value,
       window_dimensions=mlir.dense_int_elements(window_dimensions),
       window_strides=mlir.dense_int_elements(window_strides),
-      padding=ir.DenseIntElementsAttr.get(np.asarray(padding, np.int64),
-                                          shape=(len(padding), 2)))
+      padding=_padding_attr(padding))
   select = op.select.blocks.append(scalar_type, scalar_type)
   with ir.InsertionPoint(select):
     if select_jaxpr.effects:
@@ -550,7 +900,7 @@ def _select_and_scatter_add_transpose(
   assert ad.is_undefined_primal(source) and not ad.is_undefined_primal(operand)
   if type(t) is ad_util.Zero:
     return [ad_util.Zero(source.aval), None]
-  ones = (1,) * len(window_dimensions)
+  ones = _ones_tuple(len(window_dimensions))
   source_t = _select_and_gather_add(t, operand, select_prim, window_dimensions,
                                     window_strides, padding, ones, ones)
   return [source_t, None]
@@ -588,6 +938,9 @@ def _select_and_scatter_add_impl(source, operand, *,
   dtype = source.dtype
   select = lambda x, y: select_prim.bind(x, y)
   scatter = lax.bitwise_or if dtype == np.bool_ else lax.add
+  # Without padding there is nothing to expand, and the pad/slice pair would
+  # only add two full-size copies of the operand and the result.
+  expand_padding = expand_padding and any(lo or hi for lo, hi in padding)
   if expand_padding:
     operand_shape = operand.shape
     original_padding = padding
@@ -657,6 +1010,9 @@ def _select_and_gather_add_lowering(
     double_word_dtype = lax._UINT_DTYPES[nbits * 2]
     word_type = mlir.dtype_to_ir_type(word_dtype)
     double_word_type = mlir.dtype_to_ir_type(double_word_dtype)
+    # Shift amount shared by every pack() outside the reducer. It must not be
+    # used inside the reducer region, which gets its own via fst_operand().
+    pack_shift = const(double_word_dtype, nbits)
 
     # Packs two values into a tuple.
     def pack(a, b):
@@ -666,18 +1022,20 @@ def _select_and_gather_add_lowering(
       b = mhlo.BitcastConvertOp(ir.RankedTensorType.get(b_dims, word_type), b)
       a = mhlo.ConvertOp(ir.RankedTensorType.get(a_dims, double_word_type), a)
       b = mhlo.ConvertOp(ir.RankedTensorType.get(b_dims, double_word_type), b)
-      a = mhlo.ShiftLeftOp(a,
-                           _broadcast(const(double_word_dtype, nbits), a_dims))
+      a = mhlo.ShiftLeftOp(a, _broadcast(pack_shift, a_dims))
       return mhlo.OrOp(a, b)
 
-    # Unpacks the first element of a tuple.
-    def fst(t):
+    # Unpacks the first element of a scalar tuple; `shift` is the constant
+    # returned by `fst_operand()`.
+    def fst(t, shift):
       dims = ir.RankedTensorType(t.type).shape
-      st = mhlo.ShiftRightLogicalOp(t, const(double_word_dtype, nbits))
+      st = mhlo.ShiftRightLogicalOp(t, shift)
       return mhlo.BitcastConvertOp(
           ir.RankedTensorType.get(dims, etype),
           mhlo.ConvertOp(ir.RankedTensorType.get(dims, word_type), st)).result
 
+    fst_operand = lambda: const(double_word_dtype, nbits)
+
     # Unpacks the second element of a tuple.
     def snd(t):
       dims = ir.RankedTensorType(t.type).shape
@@ -701,6 +1059,8 @@ def _select_and_gather_add_lowering(
 
     double_word_dtype = word_dtype = lax._UINT_DTYPES[nbits]
     double_word_type = word_type = mlir.dtype_to_ir_type(word_dtype)
+    # Shift amount shared by every pack() and snd() outside the reducer.
+    shift = const(word_dtype, r_nbits)
 
     # Packs two values into a tuple.
     def pack(a, b):
@@ -712,22 +1072,24 @@ def _select_and_gather_add_lowering(
                                   mantissa_bits=mlir.i32_attr(nmant))
       a = mhlo.BitcastConvertOp(ir.RankedTensorType.get(a_dims, word_type), a)
       b = mhlo.BitcastConvertOp(ir.RankedTensorType.get(b_dims, word_type), b)
-      b = mhlo.ShiftRightLogicalOp(
-          b, _broadcast(const(word_dtype, r_nbits), b_dims))
+      b = mhlo.ShiftRightLogicalOp(b, _broadcast(shift, b_dims))
       return mhlo.OrOp(a, b)
 
-    # Unpacks the first element of a tuple.
-    def fst(t):
-      st = mhlo.AndOp(t, const(word_dtype, ((1 << r_nbits) - 1) << r_nbits))
+    # Unpacks the first element of a scalar tuple; `mask` is the constant
+    # returned by `fst_operand()`.
+    def fst(t, mask):
+      st = mhlo.AndOp(t, mask)
       return mhlo.BitcastConvertOp(ir.RankedTensorType.get([], etype),
                                    st).result
 
+    fst_operand = lambda: const(word_dtype, ((1 << r_nbits) - 1) << r_nbits)
+
     # Unpacks the second element of a tuple.
     def snd(t):
       dims = ir.RankedTensorType(t.type).shape
       return mhlo.BitcastConvertOp(
           ir.RankedTensorType.get(dims, etype),
-          mhlo.ShiftLeftOp(t, _broadcast(const(word_dtype, r_nbits), dims))
+          mhlo.ShiftLeftOp(t, _broadcast(shift, dims))
           ).result
 
   assert select_prim is lax.ge_p or select_prim is lax.le_p, select_prim
@@ -740,15 +1102,17 @@ def _select_and_gather_add_lowering(
       window_strides=mlir.dense_int_elements(window_strides),
       base_dilations=mlir.dense_int_elements(base_dilation),
       window_dilations=mlir.dense_int_elements(window_dilation),
-      padding=ir.DenseIntElementsAttr.get(np.asarray(padding, np.int64),
-                                          shape=(len(padding), 2)))
+      padding=_padding_attr(padding))
   scalar_type = ir.RankedTensorType.get([], double_word_type)
   reducer = rw.regions[0].blocks.append(scalar_type, scalar_type)
   with ir.InsertionPoint(reducer):
     x, y = reducer.arguments
     assert select_prim is lax.ge_p or select_prim is lax.le_p
     which = "GE" if select_prim is lax.ge_p else "LE"
-    out = mhlo.SelectOp(mlir.compare_mhlo(fst(x), fst(y), which), x, y)
+    # The reducer region is isolated from above, so its constant is created
+    # inside it, once for both arguments.
+    c = fst_operand()
+    out = mhlo.SelectOp(mlir.compare_mhlo(fst(x, c), fst(y, c), which), x, y)
     mhlo.ReturnOp(out)
   return [snd(rw.result)]
 
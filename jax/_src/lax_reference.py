@@ -306,17 +306,26 @@ def reduce(operand, init_value, computation, dimensions):  # pylint: disable=red
   return reducer(operand, tuple(dimensions)).astype(np.asarray(operand).dtype)
 
 def reduce_window(operand, init_value, computation, window_dimensions,
-                  window_strides, padding, base_dilation):
+                  window_strides, padding, base_dilation, window_dilation=None):
   op, dims, strides = operand, window_dimensions, window_strides
+  if window_dilation:
+    dilated_dims = tuple(int(d) for d in
+                         np.add(np.multiply(np.subtract(dims, 1),
+                                            window_dilation), 1))
+  else:
+    dilated_dims = tuple(dims)
   if isinstance(padding, str):
-    pads = padtype_to_pads(op.shape, dims, strides, padding)
+    pads = padtype_to_pads(op.shape, dilated_dims, strides, padding)
   else:
     pads = padding
   op = op.reshape((1, 1) + op.shape)
   if base_dilation:
     op = _dilate(op, base_dilation, init_value)
-  view = _conv_view(op, (1, 1) + dims, strides, pads,
+  view = _conv_view(op, (1, 1) + dilated_dims, strides, pads,
                     pad_value=init_value)[0]
+  if window_dilation:
+    view = view[(_slice(None),) * (view.ndim - len(dims)) +
+                tuple(_slice(None, None, d) for d in window_dilation)]
   view = view.reshape(view.shape[1:1+len(dims)] + (-1,))
   reducer = _make_reducer(computation, init_value)
   return reducer(view, axis=-1)
@@ -14,12 +14,10 @@
 
 import contextlib
 import dataclasses
-import functools
-import itertools
 import os.path
 import threading
 import types
-from typing import Optional, Iterator, NamedTuple, Union, Tuple
+from typing import Dict, List, Optional, Iterator, NamedTuple, Union, Tuple
 
 import jax.version
 from jax._src.lib import xla_client
@@ -37,28 +35,28 @@ class Frame(NamedTuple):
 
 
 _exclude_paths = [os.path.dirname(jax.version.__file__)]
+# A tuple copy of _exclude_paths, which str.startswith accepts directly.
+_exclude_paths_tuple = tuple(_exclude_paths)
 
 def register_exclusion(path):
+  global _exclude_paths_tuple
   _exclude_paths.append(path)
+  _exclude_paths_tuple = tuple(_exclude_paths)
+  _user_filename_cache.clear()
 
 class Scope(NamedTuple):
   name: str
 
-  def wrap(self, stack: Tuple[str, ...]) -> Tuple[str, ...]:
-    return (self.name, *stack)
-
 class Transform(NamedTuple):
   name: str
 
-  def wrap(self, stack: Tuple[str, ...]) -> Tuple[str, ...]:
-    if stack:
-      return (f'{self.name}({stack[0]})', *stack[1:])
-    else:
-      return ()
-
 @dataclasses.dataclass(frozen=True)
 class NameStack:
   stack: Tuple[Union[Scope, Transform], ...] = ()
+  # Memoized result of __str__; name stacks are immutable and the same stack is
+  # typically printed once per equation when lowering.
+  _str: Optional[str] = dataclasses.field(
+      default=None, init=False, repr=False, compare=False)
 
   def extend(self, name: Union[Tuple[str, ...], str]) -> 'NameStack':
     if not isinstance(name, tuple):
@@ -80,17 +78,43 @@ class NameStack:
   def __len__(self):
     return len(self.stack)
 
+  # Name stacks are immutable, so adding an empty stack can return the other
+  # operand as is.
   def __add__(self, other: 'NameStack') -> 'NameStack':
+    if not other.stack:
+      return self
+    if not self.stack:
+      return other
     return NameStack(self.stack + other.stack)
 
   def __radd__(self, other: 'NameStack') -> 'NameStack':
+    if not other.stack:
+      return self
+    if not self.stack:
+      return other
     return NameStack(other.stack + self.stack)
 
   def __str__(self) -> str:
-    scope: Tuple[str, ...] = ()
-    for elem in self.stack[::-1]:
-      scope = elem.wrap(scope)
-    return '/'.join(scope)
+    if self._str is None:
+      object.__setattr__(self, '_str', self._format())
+    return self._str  # type: ignore[return-value]
+
+  def _format(self) -> str:
+    # Each transform wraps the name of the first scope that follows it, e.g.
+    # (Transform('jvp'), Scope('f'), Scope('g')) becomes 'jvp(f)/g'. Trailing
+    # transforms with no scope to wrap are dropped.
+    scopes: List[str] = []
+    transforms: List[str] = []
+    for elem in self.stack:
+      if type(elem) is Transform:
+        transforms.append(elem.name)
+      else:
+        name = elem.name
+        for transform in reversed(transforms):
+          name = f'{transform}({name})'
+        scopes.append(name)
+        transforms.clear()
+    return '/'.join(scopes)
 
 class SourceInfo(NamedTuple):
   traceback: Optional[Traceback]
@@ -102,13 +126,28 @@ class SourceInfo(NamedTuple):
     name_stack = self.name_stack if name_stack is None else name_stack
     return self._replace(traceback=traceback, name_stack=name_stack)
 
+  def replace_traceback(self, traceback: Optional[Traceback]) -> 'SourceInfo':
+    return SourceInfo(traceback, self.name_stack)
+
+  def replace_name_stack(self, name_stack: NameStack) -> 'SourceInfo':
+    return SourceInfo(self.traceback, name_stack)
+
 def new_source_info() -> SourceInfo:
   return SourceInfo(None, NameStack())
 
+# Maps a filename to is_user_filename(filename). There is one entry per source
+# file seen in a traceback; code objects share their co_filename string, so
+# lookups hit the string's cached hash.
+_user_filename_cache: Dict[str, bool] = {}
+
 def is_user_filename(filename: str) -> bool:
   """Heuristic that guesses the identity of the user's code in a stack trace."""
-  return (filename.endswith("_test.py") or
-          not any(filename.startswith(p) for p in _exclude_paths))
+  is_user = _user_filename_cache.get(filename)
+  if is_user is None:
+    is_user = (filename.endswith("_test.py") or
+               not filename.startswith(_exclude_paths_tuple))
+    _user_filename_cache[filename] = is_user
+  return is_user
 
 def _raw_frame_to_frame(code: types.CodeType, lasti: int) -> Frame:
   return Frame(file_name=code.co_filename,
@@ -128,12 +167,47 @@ def user_frames(source_info: SourceInfo) -> Iterator[Frame]:
   return (_raw_frame_to_frame(code[i], lasti[i]) for i in range(len(code))  # type: ignore
           if is_user_filename(code[i].co_filename))
 
-@functools.lru_cache(maxsize=64)
+def _user_frames_list(source_info: SourceInfo, limit: int) -> List[Frame]:
+  """Returns at most `limit` of the user's frames, innermost first."""
+  traceback = source_info.traceback
+  if traceback is None or limit <= 0:
+    return []
+  code, lasti = traceback.raw_frames()
+  frames: List[Frame] = []
+  for i in range(len(code)):
+    if is_user_filename(code[i].co_filename):
+      frames.append(_raw_frame_to_frame(code[i], lasti[i]))
+      if len(frames) == limit:
+        break
+  return frames
+
+class _UserFrameCache(threading.local):
+  # Maps id(traceback) to (traceback, user frame), in insertion order. Holding
+  # the traceback keeps it alive, so the id of a cached entry is never reused.
+  frames: Dict[int, Tuple[Traceback, Optional[Frame]]]
+
+  def __init__(self):
+    self.frames = {}
+
+_user_frame_cache = _UserFrameCache()
+_USER_FRAME_CACHE_SIZE = 64
+
 def user_frame(source_info: SourceInfo) -> Optional[Frame]:
-  return next(user_frames(source_info), None)
+  traceback = source_info.traceback
+  if traceback is None:
+    return None
+  frames = _user_frame_cache.frames
+  entry = frames.get(id(traceback))
+  if entry is not None:
+    return entry[1]
+  frame = next(user_frames(source_info), None)
+  if len(frames) >= _USER_FRAME_CACHE_SIZE:
+    del frames[next(iter(frames))]
+  frames[id(traceback)] = (traceback, frame)
+  return frame
 
 def summarize(source_info: SourceInfo, num_frames=1) -> str:
-  frames = itertools.islice(user_frames(source_info), num_frames)
+  frames = _user_frames_list(source_info, num_frames)
   frame_strs = [f"{frame.file_name}:{frame.line_num} ({frame.function_name})"
                 if frame else "unknown" for frame in frames]
   return '\n'.join(reversed(frame_strs))
@@ -149,7 +223,7 @@ _source_info_context = _SourceInfoContext()
 def current() -> SourceInfo:
   source_info = _source_info_context.context
   if not source_info.traceback:
-    source_info = source_info.replace(traceback=xla_client.Traceback.get_traceback())
+    source_info = source_info.replace_traceback(xla_client.Traceback.get_traceback())
   return source_info
 
 class JaxStackTraceBeforeTransformation(Exception): pass
@@ -199,7 +273,7 @@ def current_name_stack() -> NameStack:
 def extend_name_stack(name: str) -> Iterator[NameStack]:
   prev_context = _source_info_context.context
   curr_name_stack = prev_context.name_stack
-  new_context = prev_context.replace(name_stack=curr_name_stack.extend(name))
+  new_context = prev_context.replace_name_stack(curr_name_stack.extend(name))
   _source_info_context.context = new_context
   try:
     yield _source_info_context.context.name_stack
@@ -209,7 +283,7 @@ def extend_name_stack(name: str) -> Iterator[NameStack]:
 @contextlib.contextmanager
 def set_name_stack(name_stack: NameStack) -> Iterator[None]:
   prev_context = _source_info_context.context
-  new_context = prev_context.replace(name_stack=name_stack)
+  new_context = prev_context.replace_name_stack(name_stack)
   _source_info_context.context = new_context
   try:
     yield
@@ -225,7 +299,8 @@ def reset_name_stack() -> Iterator[None]:
 def transform_name_stack(name: str) -> Iterator[NameStack]:
   prev_context = _source_info_context.context
   curr_name_stack = prev_context.name_stack
-  new_context = prev_context.replace(name_stack=curr_name_stack.transform(name))
+  new_context = prev_context.replace_name_stack(
+      curr_name_stack.transform(name))
   _source_info_context.context = new_context
   try:
     yield _source_info_context.context.name_stack
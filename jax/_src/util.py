@@ -439,7 +439,7 @@ def assert_unreachable(x):
 
 def tuple_insert(t, idx, val):
   assert 0 <= idx <= len(t), (idx, len(t))
-  return t[:idx] + (val,) + t[idx:]
+  return (*t[:idx], val, *t[idx:])
 
 def tuple_delete(t, idx):
   assert 0 <= idx < len(t), (idx, len(t))
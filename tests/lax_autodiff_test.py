@@ -814,6 +814,22 @@ class LaxAutodiffTest(jtu.JaxTestCase):
     check_grads(fun, (operand,), gradient_order, ["fwd", "rev"], tol, tol,
                 eps)
 
+  def testReduceWindowSumGradStrided(self):
+    # The transpose of a strided window sum pads the cotangent explicitly rather
+    # than using base dilation, which e.g. jax2tf without XLA can't convert.
+    def fun(operand):
+      return lax.reduce_window(operand, 0., lax.add, (2, 3), (2, 2), "SAME")
+
+    operand = jtu.rand_small(self.rng())((5, 7), np.float32)
+    check_grads(fun, (operand,), 2, ["fwd", "rev"], eps=1.)
+
+    jaxpr = jax.make_jaxpr(jax.grad(lambda x: fun(x).sum()))(operand).jaxpr
+    eqns = [e for e in jaxpr.eqns
+            if e.primitive is lax.reduce_window_sum_p]
+    self.assertNotEmpty(eqns)
+    for eqn in eqns:
+      self.assertEqual(eqn.params["base_dilation"], (1, 1))
+
   @parameterized.named_parameters(jtu.cases_from_list(
       {"testcase_name": "_op={}_shape={}_axis={}_reverse={}"
        .format(op.__name__, jtu.format_shape_dtype_string(shape, dtype), axis,
@@ -40,6 +40,7 @@ from jax.interpreters import mlir
 from jax.interpreters import batching
 from jax.interpreters import pxla
 from jax._src import array
+from jax._src import config as jax_config
 from jax._src.lib.mlir.dialects import mhlo
 from jax._src import dispatch
 from jax._src import dtypes
@@ -1747,12 +1748,12 @@ class LaxTest(jtu.JaxTestCase):
 
     def reference_fun(operand, init_val):
       return lax_reference.reduce_window(operand, init_val, op, dims, strides,
-                                         padding, base_dilation)
+                                         padding, base_dilation,
+                                         window_dilation)
 
     args_maker = lambda: [rng(shape, dtype), init_val]
     self._CompileAndCheck(fun, args_maker)
-    if all(d == 1 for d in window_dilation):
-      self._CheckAgainstNumpy(reference_fun, fun, args_maker)
+    self._CheckAgainstNumpy(reference_fun, fun, args_maker)
 
     # we separately test the version that uses a concrete init_val because it
     # can hit different code paths
@@ -1806,15 +1807,162 @@ class LaxTest(jtu.JaxTestCase):
     def reference_fun(*operands):
       return [
           lax_reference.reduce_window(operand, init_val, op, dims, strides,
-                                      padding, base_dilation)
+                                      padding, base_dilation, window_dilation)
           for operand, init_val, op in zip(operands, init_values,
                                            [np.add, np.maximum])]
 
     args_maker = lambda: [rng(shape, dtype), rng(shape, dtype)]
     self._CompileAndCheck(fun, args_maker)
-    if all(d == 1 for d in window_dilation):
-      self._CheckAgainstNumpy(reference_fun, fun, args_maker)
+    self._CheckAgainstNumpy(reference_fun, fun, args_maker)
+
+
+  @jtu.sample_product(
+    [dict(init_val=init_val, op=op, np_op=np_op)
+      for init_val, op, np_op in [
+          (0, lax.add, np.add),
+          (-np.inf, lax.max, np.maximum),
+          (np.inf, lax.min, np.minimum),
+      ]
+    ],
+    [dict(shape=shape, dims=dims, strides=strides, padding=padding)
+      for shape, dims, strides, padding in [
+          ((300,), (96,), (1,), "VALID"),
+          ((300,), (100,), (1,), "SAME"),
+          ((257,), (128,), (1,), [(3, 5)]),
+          ((2, 300, 3), (1, 110, 1), (1, 1, 1), [(1, 2), (105, 0), (0, 1)]),
+          ((2, 300, 3), (1, 110, 1), (2, 1, 1), "SAME"),
+          ((2, 20, 21, 3), (1, 5, 4, 1), (1, 2, 3, 1), "SAME"),
+          ((20, 21, 3), (5, 4, 2), (1, 1, 1), [(1, 2), (0, 3), (1, 0)]),
+          ((4, 300), (4, 300), (1, 1), "VALID"),
+          ((4, 30, 5), (1, 30, 2), (2, 3, 1), [(1, 0), (0, 0), (0, 1)]),
+      ]
+    ],
+    dtype=[np.float32, np.int32],
+  )
+  def testReduceWindowLargeWindow(self, op, np_op, init_val, dtype, shape, dims,
+                                  strides, padding):
+    # Large windows take specialized lowerings on CPU.
+    if dtypes.issubdtype(dtype, np.integer):
+      # Integer min/max windows are padded with the iinfo identities.
+      info = np.iinfo(dtype)
+      init_val = np.clip(init_val, info.min, info.max)
+      rng = jtu.rand_default(self.rng())
+    else:
+      rng = jtu.rand_small(self.rng())
+    init_val = np.asarray(init_val, dtype=dtype)
+
+    def fun(operand):
+      return lax.reduce_window(operand, init_val, op, dims, strides, padding)
+
+    def reference_fun(operand):
+      return lax_reference.reduce_window(operand, init_val, np_op, dims,
+                                         strides, padding, (1,) * len(shape))
+
+    args_maker = lambda: [rng(shape, dtype)]
+    self._CompileAndCheck(fun, args_maker)
+    self._CheckAgainstNumpy(reference_fun, fun, args_maker)
+
+  @jtu.sample_product(
+    [dict(init_val=init_val, op=op)
+      for init_val, op in [(0, lax.add), (-np.inf, lax.max), (np.inf, lax.min)]
+    ],
+  )
+  def testReduceWindowIdentityWindow(self, op, init_val):
+    shape = (3, 4)
+    init_val = np.asarray(init_val, dtype=np.float32)
+    fun = lambda x: lax.reduce_window(x, init_val, op, (1, 1), (1, 1), "VALID")
+    jaxpr = jax.make_jaxpr(fun)(np.ones(shape, np.float32))
+    self.assertEmpty(jaxpr.eqns)
+    x = jtu.rand_small(self.rng())(shape, np.float32)
+    self.assertAllClose(fun(jnp.asarray(x)), x)
+
+  @jtu.sample_product(
+    [dict(init_val=init_val, op=op, np_op=np_op)
+      for init_val, op, np_op in [
+          (0, lax.add, np.add),
+          (-np.inf, lax.max, np.maximum),
+          (np.inf, lax.min, np.minimum),
+      ]
+    ],
+    [dict(shape=shape, dims=dims, strides=strides, padding=padding,
+          window_dilation=window_dilation)
+      for shape, dims, strides, padding, window_dilation in [
+          ((7, 9), (2, 2), (1, 1), "VALID", (2, 3)),
+          ((7, 9), (3, 3), (2, 1), "SAME", (1, 2)),
+          ((2, 8, 9, 3), (1, 3, 2, 1), (1, 2, 2, 1), [(0, 0), (1, 2), (2, 1),
+                                                       (0, 0)], (1, 2, 3, 1)),
+          ((20, 21, 3), (5, 4, 1), (1, 1, 1), "SAME", (2, 3, 1)),
+          ((2, 16, 17, 3), (1, 4, 4, 1), (1, 2, 3, 1), [(0, 0), (1, 2), (3, 0),
+                                                        (0, 0)], (1, 2, 2, 1)),
+          ((6, 7, 8), (2, 3, 3), (1, 1, 1), "VALID", (2, 2, 2)),
+      ]
+    ],
+    dtype=[np.float32],
+  )
+  def testReduceWindowDilatedWindow(self, op, np_op, init_val, dtype, shape,
+                                    dims, strides, padding, window_dilation):
+    # Dilated windows are taken apart into strided slices or one-axis passes
+    # by the CPU lowerings.
+    rng = jtu.rand_small(self.rng())
+    init_val = np.asarray(init_val, dtype=dtype)
+
+    def fun(operand):
+      return lax.reduce_window(operand, init_val, op, dims, strides, padding,
+                               window_dilation=window_dilation)
+
+    def reference_fun(operand):
+      return lax_reference.reduce_window(operand, init_val, np_op, dims,
+                                         strides, padding, (1,) * len(shape),
+                                         window_dilation)
+
+    args_maker = lambda: [rng(shape, dtype)]
+    self._CompileAndCheck(fun, args_maker)
+    self._CheckAgainstNumpy(reference_fun, fun, args_maker)
 
+  @jtu.sample_product(
+    [dict(shape=shape, dims=dims, strides=strides, padding=padding)
+      for shape, dims, strides, padding in [
+          # One window for each CPU lowering: unrolled slices, prefix scan,
+          # one-axis passes, a full window and a partially full window.
+          ((2, 16, 16, 3), (1, 3, 3, 1), (1, 2, 2, 1), "SAME"),
+          ((2, 300, 3), (1, 200, 1), (1, 1, 1), "SAME"),
+          ((2, 16, 16, 3), (1, 5, 5, 1), (1, 2, 2, 1), "SAME"),
+          ((2, 16, 16, 3), (1, 16, 16, 1), (1, 1, 1, 1), "VALID"),
+          ((2, 16, 16, 3), (1, 16, 3, 1), (1, 1, 2, 1),
+           [(0, 0), (0, 0), (1, 1), (0, 0)]),
+      ]
+    ],
+  )
+  @jtu.skip_on_devices("gpu", "tpu")
+  def testReduceWindowSumBF16Accumulation(self, shape, dims, strides, padding):
+    rng = jtu.rand_small(self.rng())
+    x = rng(shape, np.float32)
+    fun = lambda x: lax.reduce_window(x, 0., lax.add, dims, strides, padding)
+    jit_fun = jax.jit(fun)
+    expected = lax_reference.reduce_window(
+        x, np.float32(0), np.add, dims, strides, padding, (1,) * len(shape))
+    is_bf16 = lambda out: np.array_equal(
+        out, np.asarray(out).astype(dtypes.bfloat16).astype(np.float32))
+
+    # Toggling the flag must take effect for an already-compiled function and
+    # for the cached eager primitive, in both directions.
+    outs = {}
+    for bf16_accum in [False, True, False]:
+      with jax_config.reduce_window_bf16_accum(bf16_accum):
+        self.assertEqual("bf16" in jit_fun.lower(x).as_text(), bf16_accum)
+        outs[bf16_accum] = (jit_fun(x), fun(x))
+        for out in outs[bf16_accum]:
+          self.assertEqual(out.dtype, np.float32)
+          self.assertAllClose(out, expected, atol=5e-2, rtol=5e-2)
+          # Every part of the window, including axes it covers entirely, must
+          # be summed in bfloat16.
+          self.assertEqual(is_bf16(out), bf16_accum)
+
+    exact_jit, exact_eager = outs[False]
+    self.assertAllClose(exact_jit, expected)
+    self.assertAllClose(exact_eager, expected)
+    bf16_jit, bf16_eager = outs[True]
+    self.assertArraysEqual(bf16_jit, bf16_eager)
 
   def testReduceWindowFailures(self):
     def empty_window_test():
@@ -1829,6 +1977,12 @@ class LaxTest(jtu.JaxTestCase):
       with self.assertRaisesRegex(TypeError, "must have every element be"):
         failure_fun()
 
+    # A unit window must not skip the shape rule's consistency checks.
+    with self.assertRaisesRegex(
+        TypeError, "inconsistent base_dilation and window_dimensions"):
+      lax.reduce_window(jnp.ones((3, 4)), 0., lax.add, (1, 1), (1, 1),
+                        'VALID', base_dilation=(1,))
+
     with self.assertRaisesRegex(
         ValueError,
         "reduce_window output must have the same tree structure as the "
@@ -20,6 +20,7 @@ from jax import core
 from jax import lax
 from jax import linear_util as lu
 from jax.config import config
+from jax._src import source_info_util
 from jax._src import test_util as jtu
 from jax._src.lib import xla_client
 
@@ -93,6 +94,14 @@ class NameStackTest(_EnableNameStackTestCase):
     self.assertEqual(str(jaxpr.eqns[0].source_info.name_stack), 'foo')
     self.assertEqual(str(jaxpr.eqns[1].source_info.name_stack), 'bar/baz')
 
+  def test_name_stack_str_with_transforms(self):
+    name_stack = (source_info_util.NameStack()
+                  .transform('vmap').extend('foo').transform('jvp')
+                  .transform('transpose').extend(('bar', 'baz'))
+                  .transform('pmap'))
+    self.assertEqual(str(name_stack), 'vmap(foo)/jvp(transpose(bar))/baz')
+    self.assertEqual(str(source_info_util.NameStack().transform('vmap')), '')
+
   def test_call_primitive_jaxpr_should_not_store_outer_name_stack(self):
     @jax.named_scope('foo')
     def f(x):
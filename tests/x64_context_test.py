@@ -15,7 +15,7 @@
 
 import concurrent.futures
 from functools import partial
-import time
+import threading
 import unittest
 
 from absl.testing import absltest
@@ -104,17 +104,21 @@ class X64ContextTests(jtu.JaxTestCase):
       self.assertArraysEqual(count_to(10), jnp.float32(10), check_dtypes=True)
 
   def test_thread_safety(self):
+    # Both threads wait here until the other has entered its context, so each
+    # array is created while the other thread's setting is active.
+    barrier = threading.Barrier(2, timeout=10)
+
     def func_x32():
       with disable_x64():
-        time.sleep(0.1)
+        barrier.wait()
         return jnp.array(np.int64(0)).dtype
 
     def func_x64():
       with enable_x64():
-        time.sleep(0.1)
+        barrier.wait()
         return jnp.array(np.int64(0)).dtype
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
       x32 = executor.submit(func_x32)
       x64 = executor.submit(func_x64)
       self.assertEqual(x64.result(), jnp.int64)
@@ -126,10 +130,12 @@ class X64ContextTests(jtu.JaxTestCase):
 
     f = partial(random.uniform, random.PRNGKey(0), (1,), 'float64', -1, 1)
     with disable_x64():
-      for _ in range(2):
+      f()
+      with jtu.assert_num_jit_and_pmap_compilations(0):
         f()
     with enable_x64():
-      for _ in range(2):
+      f()
+      with jtu.assert_num_jit_and_pmap_compilations(0):
         f()
 
   @unittest.skip("test fails, see #8552")